@@ -0,0 +1,192 @@
+"""
+Helper functions for attributing the TMA categories to functions of a
+benchmark. The TmaHotspotProfiler (built from tma_hotspot/ with gem5 EXTRAS)
+records per-PC histograms during simulation, the remaining functions read
+them back and symbolize the PCs offline against the benchmark's ELF.
+"""
+
+import bisect
+import math
+import os
+import struct
+import subprocess
+
+# TMA category each profiler event is attributed to
+EVENT_CATEGORIES = {
+    'commit': "Retiring",
+    'mispredict': "Bad Speculation",
+    'long_latency_load': "Backend Bound",
+}
+
+UNKNOWN_SYMBOL = "[unknown]"
+
+def attach_hotspot_profiler(cpu, commit_sample_interval=1000,
+                            long_latency_threshold=30,
+                            output_file="tma_hotspots.txt"):
+    """Attach a TmaHotspotProfiler to the probe points of an O3 CPU object"""
+    from m5.objects import TmaHotspotProfiler
+
+    cpu.hotspot_profiler = TmaHotspotProfiler(
+        commit_sample_interval=commit_sample_interval,
+        long_latency_threshold=long_latency_threshold,
+        output_file=output_file
+    )
+
+def read_hotspot_samples(path, dump=0):
+    """
+    Read one dump of a profiler output file and return a dictionary mapping
+    each event to a {pc: count} histogram.
+    """
+    samples = {event: {} for event in EVENT_CATEGORIES}
+    current_dump = -1
+    in_dump = False
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("---------- Begin Hotspot Samples"):
+                current_dump += 1
+                in_dump = current_dump == dump
+            elif line.startswith("---------- End Hotspot Samples"):
+                if in_dump:
+                    return samples
+                in_dump = False
+            elif in_dump and line and not line.startswith("#"):
+                event, pc, count = line.split()
+                samples[event][int(pc, 16)] = int(count)
+    if current_dump < dump:
+        raise ValueError(f"{path} contains no dump {dump}")
+    return samples
+
+def get_partition_offset(image, partition, sector_size=512):
+    """
+    Return the byte offset of a partition (numbered from 1) of an MBR or GPT
+    partitioned disk image
+    """
+    with open(image, "rb") as f:
+        mbr = f.read(sector_size)
+        if mbr[510:512] != b"\x55\xaa":
+            raise ValueError(f"{image} has no partition table")
+        entries = [mbr[446 + 16 * i:462 + 16 * i] for i in range(4)]
+        if entries[0][4] == 0xEE:
+            # Protective MBR, the partitions are listed in the GPT
+            f.seek(sector_size)
+            header = f.read(92)
+            if header[:8] != b"EFI PART":
+                raise ValueError(f"{image} has an invalid GPT header")
+            entries_lba = struct.unpack_from("<Q", header, 72)[0]
+            num_entries, entry_size = struct.unpack_from("<II", header, 80)
+            if not 1 <= partition <= num_entries:
+                raise ValueError(f"{image} has no partition {partition}")
+            f.seek(entries_lba * sector_size + (partition - 1) * entry_size)
+            start = struct.unpack_from("<Q", f.read(entry_size), 32)[0]
+        else:
+            if not 1 <= partition <= 4:
+                raise ValueError(f"{image} has no primary partition {partition}")
+            start = struct.unpack_from("<I", entries[partition - 1], 8)[0]
+    if start == 0:
+        raise ValueError(f"{image} has no partition {partition}")
+    return start * sector_size
+
+def extract_from_image(image, path_in_image, dest, offset=0):
+    """
+    Copy a file out of an ext disk image with debugfs, offset is the byte
+    offset of the file system in a partitioned image
+    """
+    if offset:
+        image = f"{image}?offset={offset}"
+    subprocess.run(
+        ["debugfs", "-R", f"dump -p {path_in_image} {dest}", image],
+        check=True,
+        capture_output=True
+    )
+    if not os.path.exists(dest):
+        raise FileNotFoundError(f"{path_in_image} not found in {image}")
+    return dest
+
+class SymbolTable:
+    """Function symbols of an ELF sorted by address, read with nm"""
+
+    def __init__(self, elf, nm="riscv64-linux-gnu-nm", load_base=0):
+        self.load_base = load_base
+        symbols = {}
+        output = subprocess.run(
+            [nm, "--defined-only", "--numeric-sort", "--print-size",
+             "--demangle", elf],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        for line in output.splitlines():
+            # Demangled names may contain spaces, so tell "addr size kind name"
+            # and "addr kind name" apart by the single-letter kind
+            fields = line.split(maxsplit=2)
+            if len(fields) < 3:
+                continue
+            if len(fields[1]) == 1:
+                addr, kind, name = fields
+                size = None
+            else:
+                fields = line.split(maxsplit=3)
+                if len(fields) < 4 or len(fields[2]) != 1:
+                    continue
+                addr, size, kind, name = fields
+                size = int(size, 16)
+            if kind not in "tTwW":
+                continue
+            symbols.setdefault(int(addr, 16), (size, name))
+        self._addrs = sorted(symbols)
+        self._symbols = [symbols[addr] for addr in self._addrs]
+
+    def lookup(self, pc):
+        """Return the function containing pc or UNKNOWN_SYMBOL"""
+        addr = pc - self.load_base
+        i = bisect.bisect_right(self._addrs, addr) - 1
+        if i < 0:
+            return UNKNOWN_SYMBOL
+        size, name = self._symbols[i]
+        if size is None:
+            # Without a size the symbol ends where the next one starts
+            if i == len(self._addrs) - 1:
+                return UNKNOWN_SYMBOL
+        elif addr >= self._addrs[i] + size:
+            return UNKNOWN_SYMBOL
+        return name
+
+def wilson_interval(count, total, z=1.96):
+    """95% Wilson score interval of the fraction count / total"""
+    if total == 0:
+        return 0.0, 0.0
+    p = count / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def attribute_hotspots(samples, symbols, top=10):
+    """
+    Aggregate the PC histograms per function and return, for every TMA
+    category, the top functions with their sample counts, fractions and
+    95% confidence intervals.
+    """
+    report = {}
+    for event, histogram in samples.items():
+        functions = {}
+        for pc, count in histogram.items():
+            name = symbols.lookup(pc)
+            functions[name] = functions.get(name, 0) + count
+        total = sum(functions.values())
+        ranked = sorted(functions.items(), key=lambda item: item[1], reverse=True)
+        report[EVENT_CATEGORIES[event]] = {
+            'event': event,
+            'total_samples': total,
+            'functions': [
+                {
+                    'function': name,
+                    'samples': count,
+                    'fraction': count / total,
+                    'confidence_interval': wilson_interval(count, total)
+                }
+                for name, count in ranked[:top]
+            ]
+        }
+    return report
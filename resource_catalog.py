@@ -0,0 +1,271 @@
+"""
+Local catalog of the kernel and disk images used by the scripts, so that
+resources are resolved without gem5's resource downloader and without
+touching the network.
+
+The catalog is a JSON manifest:
+
+    {
+        "resources": {
+            "riscv-bootloader-vmlinux-5.10": {
+                "category": "kernel",
+                "path": "/data/gem5/riscv-bootloader-vmlinux-5.10",
+                "md5sum": "..."
+            },
+            "spec-2006-disk-img": {
+                "category": "disk-image",
+                "path": "spec-2006.img",
+                "md5sum": "...",
+                "root_partition": "1"
+            }
+        }
+    }
+
+Relative paths are relative to the manifest. The md5sum of a file is checked
+only once: the result is memoized by path, size and mtime, so later and
+parallel jobs start without re-reading multi-GB images. Resources missing
+from a given catalog are an error, obtain_resource is only used without a
+catalog.
+
+Usage:
+------
+
+```
+python3 resource_catalog.py add resources.json riscv-disk-img ~/.cache/gem5/riscv-disk-img --category disk-image
+python3 resource_catalog.py verify resources.json
+```
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+def compute_md5sum(path, chunk_size=1 << 24):
+    """Compute the md5sum of a file without loading it into memory"""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+class ResourceCatalog:
+    """Resources of a manifest, verified once and memoized by size and mtime"""
+
+    def __init__(self, manifest, verified_dir=None):
+        self.manifest = os.path.abspath(manifest)
+        with open(self.manifest) as f:
+            self._resources = json.load(f).get("resources", {})
+        if verified_dir is None:
+            verified_dir = os.path.join(
+                os.path.dirname(self.manifest), ".resource_catalog_verified"
+            )
+            # Fall back to the gem5 cache if the manifest directory is read-only
+            if not os.path.isdir(verified_dir) and not os.access(
+                os.path.dirname(self.manifest), os.W_OK
+            ):
+                verified_dir = os.path.expanduser(
+                    "~/.cache/gem5/resource_catalog_verified"
+                )
+        self.verified_dir = verified_dir
+
+    def __contains__(self, resource_id):
+        return resource_id in self._resources
+
+    def get_path(self, resource_id):
+        """Return the absolute path of a resource"""
+        path = os.path.expanduser(self._resources[resource_id]['path'])
+        return os.path.join(os.path.dirname(self.manifest), path)
+
+    def _open_lock(self, lock_file):
+        """Open a lock file, return None if the memo directory is read-only"""
+        try:
+            os.makedirs(self.verified_dir, exist_ok=True)
+            return open(lock_file, "a")
+        except OSError:
+            return None
+
+    def _read_memo(self, memo_file):
+        try:
+            with open(memo_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_memo(self, memo_file, entry):
+        # Replace the memo atomically so that readers never see a partial file
+        tmp_file = f"{memo_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(entry, f, indent=2)
+            os.replace(tmp_file, memo_file)
+        except OSError:
+            print(f"Could not memoize the verification in {self.verified_dir}")
+
+    def _verify_resource(self, resource_id):
+        path = self.get_path(resource_id)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Resource '{resource_id}' not found at {path}")
+        md5sum = self._resources[resource_id].get('md5sum')
+        if md5sum is None:
+            return
+        st = os.stat(path)
+        entry = {
+            'path': path,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'md5sum': md5sum
+        }
+
+        # One memo and one lock per file, so that a job hashing a new image
+        # does not block jobs using already verified resources
+        name = hashlib.md5(path.encode()).hexdigest()
+        memo_file = os.path.join(self.verified_dir, f"{name}.json")
+        lock = self._open_lock(os.path.join(self.verified_dir, f"{name}.lock"))
+        try:
+            if lock is not None:
+                fcntl.flock(lock, fcntl.LOCK_SH)
+            if self._read_memo(memo_file) == entry:
+                return
+            if lock is not None:
+                # Another job may have verified the file while waiting
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                if self._read_memo(memo_file) == entry:
+                    return
+            if compute_md5sum(path) != md5sum:
+                raise ValueError(
+                    f"Resource '{resource_id}' at {path} does not match "
+                    f"md5sum {md5sum}"
+                )
+            self._write_memo(memo_file, entry)
+        finally:
+            if lock is not None:
+                lock.close()
+
+    def verify(self, resource_ids=None):
+        """
+        Check the md5sum of the given resources (all by default) unless a
+        file with the same size and mtime has already been verified. Raise
+        ValueError if a checksum does not match.
+        """
+        if resource_ids is None:
+            resource_ids = list(self._resources)
+        for resource_id in resource_ids:
+            self._verify_resource(resource_id)
+
+    def obtain_resource(self, resource_id, root_partition=None):
+        """
+        Verify a resource and return it as a gem5 resource object. For disk
+        images, root_partition overrides the one of the manifest.
+        """
+        from gem5.resources.resource import (
+            BootloaderResource,
+            DiskImageResource,
+            KernelResource,
+        )
+
+        self.verify([resource_id])
+        resource = self._resources[resource_id]
+        category = resource.get('category')
+        path = self.get_path(resource_id)
+        if category == "kernel":
+            return KernelResource(local_path=path, id=resource_id)
+        if category == "bootloader":
+            return BootloaderResource(local_path=path, id=resource_id)
+        if category == "disk-image":
+            if root_partition is None:
+                root_partition = resource.get('root_partition')
+            return DiskImageResource(
+                local_path=path,
+                root_partition=root_partition,
+                id=resource_id,
+            )
+        raise ValueError(
+            f"Resource '{resource_id}' has unsupported category '{category}'"
+        )
+
+def load_catalog(manifest=None):
+    """
+    Load the catalog from manifest or from $TMA_RESOURCE_CATALOG, return None
+    if neither is given.
+    """
+    manifest = manifest or os.environ.get("TMA_RESOURCE_CATALOG")
+    if not manifest:
+        return None
+    return ResourceCatalog(manifest)
+
+def resolve_resource(resource_id, catalog=None, root_partition=None):
+    """
+    Resolve a resource through the catalog and report the resolution time.
+    gem5's obtain_resource is only used when no catalog is configured, a
+    resource missing from a given catalog raises KeyError instead.
+    """
+    start_time = time.time()
+    if catalog is not None:
+        if resource_id not in catalog:
+            raise KeyError(
+                f"Resource '{resource_id}' is not in the resource catalog "
+                f"{catalog.manifest}"
+            )
+        resource = catalog.obtain_resource(
+            resource_id, root_partition=root_partition
+        )
+        source = "local catalog"
+    else:
+        from gem5.resources.resource import obtain_resource
+        resource = obtain_resource(resource_id)
+        source = "obtain_resource"
+    elapsed_time = time.time() - start_time
+    print(f"Resolved resource '{resource_id}' from {source} in {elapsed_time:.2f}s")
+    return resource
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Manage the local resource catalog"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Verify all resources of a manifest once"
+    )
+    verify_parser.add_argument("manifest", type=str)
+
+    add_parser = subparsers.add_parser(
+        "add", help="Add a local file to a manifest with its md5sum"
+    )
+    add_parser.add_argument("manifest", type=str)
+    add_parser.add_argument("id", type=str)
+    add_parser.add_argument("path", type=str)
+    add_parser.add_argument(
+        "--category",
+        type=str,
+        required=True,
+        choices=["kernel", "bootloader", "disk-image"],
+    )
+    add_parser.add_argument("--root-partition", type=str, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "add":
+        manifest = {"resources": {}}
+        if os.path.exists(args.manifest):
+            with open(args.manifest) as f:
+                manifest = json.load(f)
+        resource = {
+            'category': args.category,
+            'path': os.path.abspath(args.path),
+            'md5sum': compute_md5sum(args.path)
+        }
+        if args.root_partition is not None:
+            resource['root_partition'] = args.root_partition
+        manifest.setdefault("resources", {})[args.id] = resource
+        with open(args.manifest, "w") as f:
+            json.dump(manifest, f, indent=4)
+        print(f"Added resource '{args.id}' to {args.manifest}")
+    else:
+        catalog = ResourceCatalog(args.manifest)
+        start_time = time.time()
+        catalog.verify()
+        print(f"Verified {args.manifest} in {time.time() - start_time:.2f}s")
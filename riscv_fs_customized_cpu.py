@@ -8,6 +8,9 @@
 #           Benchmark SPEC 2006CPU v1.0.2 (not optimized version) 
 #           Compiler SiFive internal clang (close to upstream clang 18)
 
+import argparse
+import sys
+
 import m5
 from m5.objects import Root, Cache, SystemXBar, L2XBar, BadAddr
 
@@ -16,7 +19,6 @@ from gem5.components.memory import SingleChannelDDR3_1600
 from gem5.components.processors.cpu_types import CPUTypes
 from gem5.components.processors.simple_processor import SimpleProcessor
 from gem5.isas import ISA
-from gem5.resources.resource import obtain_resource
 from gem5.simulate.simulator import Simulator
 from gem5.utils.requires import requires
 from gem5.components.cachehierarchies.abstract_cache_hierarchy import AbstractCacheHierarchy
@@ -29,10 +31,33 @@ from gem5.components.boards.abstract_board import AbstractBoard
 
 # Import our cache helper functions
 from cache_helper import create_l1_cache, create_l2_cache, create_l3_cache, create_cache, create_l1_cache_config, create_l2_cache_config, create_l3_cache_config
+from tma_helper import compute_tma_metrics, print_tma_metrics
+from validate_helper import validate_board
+from resource_catalog import load_catalog, resolve_resource
 
 # Run a check to ensure the right version of gem5 is being used
 requires(isa_required=ISA.RISCV)
 
+parser = argparse.ArgumentParser(
+    description="RISC-V full system simulation with a three-level classic cache hierarchy"
+)
+
+parser.add_argument(
+    "--validate-only",
+    action="store_true",
+    help="Build and instantiate the system, check ports and TMA counters, then exit without simulating",
+)
+
+parser.add_argument(
+    "--resource-catalog",
+    type=str,
+    required=False,
+    default=None,
+    help="JSON manifest of local resources (defaults to $TMA_RESOURCE_CATALOG), see resource_catalog.py",
+)
+
+args = parser.parse_args()
+
 class ThreeLevelCacheHierarchy(AbstractClassicCacheHierarchy):
     """Three-level cache hierarchy with 32kB L1i/d caches and 2MB L3 cache"""
     
@@ -216,12 +241,16 @@ board = RiscvBoard(
     cache_hierarchy=cache_hierarchy,
 )
 
-# Set the Full System workload
+# Set the Full System workload, resolving resources through the local catalog
+catalog = load_catalog(args.resource_catalog)
 board.set_kernel_disk_workload(
-    kernel=obtain_resource("riscv-bootloader-vmlinux-5.10"),
-    disk_image=obtain_resource("riscv-disk-img"),
+    kernel=resolve_resource("riscv-bootloader-vmlinux-5.10", catalog),
+    disk_image=resolve_resource("riscv-disk-img", catalog),
 )
 
+if args.validate_only:
+    sys.exit(validate_board(board))
+
 # Setup the simulator and run the simulation
 simulator = Simulator(board=board)
 print("Beginning simulation!")
@@ -230,29 +259,4 @@ simulator.run()
 
 stats = board.get_stats()  # 获取统计数据
 
-cycles = stats.get("cycles", 1)
-pipeline_width = 3
-
-decoded = stats.get("decoded_less_than_maximum_operations", 0)
-bdir_mispred = stats.get("branch_direction_misprediction", 0)
-ijtp_mispred = stats.get("ijtp_misprediction", 0)
-ras_mispred = stats.get("ras_mispredicted_target", 0)
-decode_stall = stats.get("instruction_decode_stall_from_recover", 0)
-instructions = stats.get("Instructions", 0)
-
-PARTIAL_SLOT_FACTOR = 2
-FETCH_WAIT_CYCLE = 2
-BPM_COST = 9
-
-frontend_bound = (decoded * PARTIAL_SLOT_FACTOR + (bdir_mispred + ijtp_mispred + ras_mispred) * FETCH_WAIT_CYCLE * pipeline_width) / (cycles * pipeline_width)
-bad_speculation = (((bdir_mispred + ijtp_mispred + ras_mispred) * BPM_COST * pipeline_width + decode_stall * pipeline_width)) / (cycles * pipeline_width)
-retiring = instructions / (cycles * pipeline_width)
-backend_bound = 1 - (frontend_bound + bad_speculation + retiring)
-ipc = instructions / cycles
-
-print("Metrics:")
-print("Frontend Bound:", frontend_bound)
-print("Bad Speculation:", bad_speculation)
-print("Retiring:", retiring)
-print("Backend Bound:", backend_bound)
-print("IPC", ipc)
\ No newline at end of file
+print_tma_metrics(compute_tma_metrics(stats))
\ No newline at end of file
@@ -22,8 +22,12 @@ scons build/RISCV/gem5.opt
 """
 
 import argparse
+import configparser
+import json
 import os
+import sys
 import time
+from pathlib import Path
 
 import m5
 from m5.objects import RiscvO3CPU
@@ -36,7 +40,7 @@ from gem5.components.processors.cpu_types import CPUTypes
 from gem5.components.processors.base_cpu_core import BaseCPUCore
 from gem5.components.processors.base_cpu_processor import BaseCPUProcessor
 from gem5.isas import ISA
-from gem5.resources.resource import obtain_resource, DiskImageResource
+from gem5.resources.resource import DiskImageResource
 from gem5.simulate.simulator import Simulator
 from gem5.simulate.exit_event import ExitEvent
 from gem5.utils.requires import requires
@@ -46,6 +50,12 @@ from gem5.components.cachehierarchies.ruby.mi_example_cache_hierarchy import (
     MIExampleCacheHierarchy,
 )
 
+from tma_helper import compute_tma_metrics, print_tma_metrics
+from trace_helper import attach_elastic_trace
+from hotspot_helper import attach_hotspot_profiler
+from resource_catalog import load_catalog, resolve_resource
+from validate_helper import validate_board
+
 # Run a check to ensure the right version of gem5 is being used
 requires(isa_required=ISA.RISCV)
 
@@ -95,7 +105,7 @@ parser.add_argument(
     "--image",
     type=str,
     required=True,
-    help="Input the full path to the built spec-2006 disk-image",
+    help="Input the full path to the built spec-2006 disk-image, or its id in the resource catalog",
 )
 
 parser.add_argument(
@@ -103,7 +113,7 @@ parser.add_argument(
     type=str,
     required=False,
     default=None,
-    help='Input the root partition of the SPEC disk-image. If the disk is not partitioned, then pass ""',
+    help='Input the root partition of the SPEC disk-image. If the disk is not partitioned, then pass "". Overrides the root partition of a catalog image',
 )
 
 parser.add_argument(
@@ -122,20 +132,110 @@ parser.add_argument(
     choices=size_choices,
 )
 
-args = parser.parse_args()
+parser.add_argument(
+    "--validate-only",
+    action="store_true",
+    help="Build and instantiate the system, check ports and TMA counters, then exit without simulating",
+)
 
-# Validate disk image path
-if args.image[0] != "/":
-    # Get the absolute path if not already provided
-    args.image = os.path.abspath(args.image)
+parser.add_argument(
+    "--checkpoint-at-roi",
+    type=str,
+    required=False,
+    default=None,
+    help="Save a checkpoint into this directory at the start of the ROI and exit",
+)
 
-if not os.path.exists(args.image):
-    warn("Disk image not found!")
-    print("Please provide a valid path to the SPEC CPU2006 disk image")
-    exit(1)
+parser.add_argument(
+    "--restore-checkpoint",
+    type=str,
+    required=False,
+    default=None,
+    help="Restore a checkpoint taken with --checkpoint-at-roi, the ROI starts right away",
+)
+
+parser.add_argument(
+    "--capture-trace",
+    type=str,
+    required=False,
+    default=None,
+    help="Capture elastic traces of the core into this directory for riscv_trace_replay.py",
+)
+
+parser.add_argument(
+    "--trace-start-inst",
+    type=int,
+    required=False,
+    default=None,
+    help="Committed instruction count at which the trace capture starts, defaults to 0 when restoring a ROI checkpoint",
+)
+
+parser.add_argument(
+    "--hotspot-profile",
+    action="store_true",
+    help="Sample PCs per TMA category into tma_hotspots.txt (requires gem5 built with EXTRAS=tma_hotspot)",
+)
+
+parser.add_argument(
+    "--hotspot-sample-interval",
+    type=int,
+    required=False,
+    default=1000,
+    help="Sample the PC of every N-th committed instruction",
+)
+
+parser.add_argument(
+    "--resource-catalog",
+    type=str,
+    required=False,
+    default=None,
+    help="JSON manifest of local resources (defaults to $TMA_RESOURCE_CATALOG), see resource_catalog.py",
+)
+
+args = parser.parse_args()
+
+if args.checkpoint_at_roi and args.restore_checkpoint:
+    parser.error("--checkpoint-at-roi and --restore-checkpoint are mutually exclusive")
+
+# Without a ROI checkpoint the capture would start at the first instruction of the boot
+if args.capture_trace and args.trace_start_inst is None:
+    if args.restore_checkpoint is None:
+        parser.error("--capture-trace requires --restore-checkpoint or --trace-start-inst")
+    args.trace_start_inst = 0
+
+catalog = load_catalog(args.resource_catalog)
+
+# Validate disk image path, unless the image is a resource of the catalog
+if catalog is None or args.image not in catalog:
+    if args.image[0] != "/":
+        # Get the absolute path if not already provided
+        args.image = os.path.abspath(args.image)
+
+    if not os.path.exists(args.image):
+        warn("Disk image not found!")
+        print("Please provide a valid path to the SPEC CPU2006 disk image")
+        exit(1)
+
+# The guest reads the command before the ROI, so a ROI checkpoint fixes the
+# benchmark, the size and the output directory
+if args.restore_checkpoint:
+    roi_file = os.path.join(args.restore_checkpoint, "roi.json")
+    if not os.path.exists(roi_file):
+        warn("Checkpoint was not taken with --checkpoint-at-roi!")
+        print(f"Please provide a checkpoint containing {roi_file}")
+        exit(1)
+    with open(roi_file) as f:
+        roi = json.load(f)
+    if (roi['benchmark'], roi['size']) != (args.benchmark, args.size):
+        warn("Checkpoint was taken for another benchmark!")
+        print(f"The checkpoint runs {roi['benchmark']} with {roi['size']} input")
+        exit(1)
 
 # Create output directory for benchmark results
-output_dir = f"speclogs_{args.benchmark}_{args.size}_{time.strftime('%Y-%m-%d_%H-%M-%S')}"
+if args.restore_checkpoint:
+    output_dir = roi['output_dir']
+else:
+    output_dir = f"speclogs_{args.benchmark}_{args.size}_{time.strftime('%Y-%m-%d_%H-%M-%S')}"
 try:
     os.makedirs(os.path.join(m5.options.outdir, output_dir))
 except FileExistsError:
@@ -189,6 +289,23 @@ processor = BaseCPUProcessor(
     cores=[SiFiveO3Core(cpu_id=0)]  # Single core configuration
 )
 
+# Record elastic traces of the core for replaying with other memory systems
+if args.capture_trace:
+    for core in processor.get_cores():
+        attach_elastic_trace(
+            core.get_simobject(),
+            args.capture_trace,
+            start_inst=args.trace_start_inst,
+        )
+
+# Record per-PC samples of the core, reset and dumped together with the stats
+if args.hotspot_profile:
+    for core in processor.get_cores():
+        attach_hotspot_profiler(
+            core.get_simobject(),
+            commit_sample_interval=args.hotspot_sample_interval,
+        )
+
 # Setup the board
 board = RiscvBoard(
     clk_freq="32.5MHz",
@@ -201,18 +318,41 @@ board = RiscvBoard(
 command = f"{args.benchmark} {args.size} {output_dir}"
 
 # Set up the disk image and kernel
+if catalog is not None and args.image in catalog:
+    disk_image = resolve_resource(args.image, catalog, root_partition=args.partition)
+else:
+    disk_image = DiskImageResource(args.image, root_partition=args.partition)
+
 board.set_kernel_disk_workload(
-    kernel=obtain_resource("riscv-bootloader-vmlinux-5.10"),
-    disk_image=DiskImageResource(args.image, root_partition=args.partition),
+    kernel=resolve_resource("riscv-bootloader-vmlinux-5.10", catalog),
+    disk_image=disk_image,
     readfile_contents=command,
+    checkpoint=Path(args.restore_checkpoint) if args.restore_checkpoint else None,
 )
 
+if args.validate_only:
+    sys.exit(validate_board(board))
+
 # Define ROI exit handler
 def handle_exit():
-    print("Done booting Linux")
-    print("Resetting stats at the start of ROI!")
-    m5.stats.reset()
-    yield False  # Continue the simulation
+    # A restored ROI checkpoint is already past the start of the ROI
+    if args.restore_checkpoint is None:
+        print("Done booting Linux")
+        if args.checkpoint_at_roi:
+            print(f"Saving checkpoint at the start of ROI to {args.checkpoint_at_roi}")
+            simulator.save_checkpoint(Path(args.checkpoint_at_roi))
+            with open(os.path.join(args.checkpoint_at_roi, "roi.json"), "w") as f:
+                json.dump({
+                    'benchmark': args.benchmark,
+                    'size': args.size,
+                    'output_dir': output_dir
+                }, f, indent=2)
+            yield True  # Stop the simulation
+        print("Resetting stats at the start of ROI!")
+        for core in processor.get_cores():
+            print(f"ROI begins at committed instruction {core.get_simobject().totalInsts()}")
+        m5.stats.reset()
+        yield False  # Continue the simulation
     print("Dump stats at the end of the ROI!")
     m5.stats.dump()
     yield True  # Stop the simulation
@@ -237,12 +377,23 @@ m5.stats.reset()
 # Run the simulation
 simulator.run()
 
+if args.checkpoint_at_roi:
+    print("Checkpoint saved, exiting before the ROI")
+    sys.exit(0)
+
 # Print performance statistics
 print("All simulation events were successful.")
 print("Performance statistics:")
 
-roi_begin_ticks = simulator.get_tick_stopwatch()[0][1]
-roi_end_ticks = simulator.get_tick_stopwatch()[1][1]
+if args.restore_checkpoint:
+    # The ROI begins at the tick the checkpoint was taken
+    checkpoint = configparser.ConfigParser()
+    checkpoint.read(os.path.join(args.restore_checkpoint, "m5.cpt"))
+    roi_begin_ticks = checkpoint.getint("Globals", "curTick")
+    roi_end_ticks = simulator.get_tick_stopwatch()[0][1]
+else:
+    roi_begin_ticks = simulator.get_tick_stopwatch()[0][1]
+    roi_end_ticks = simulator.get_tick_stopwatch()[1][1]
 
 print(f"ROI simulated ticks: {roi_end_ticks - roi_begin_ticks}")
 print(f"Ran a total of {simulator.get_current_tick() / 1e12} simulated seconds")
@@ -254,29 +405,4 @@ print(f"Total wallclock time: {elapsed_time:.2f}s, {elapsed_time / 60:.2f} min")
 
 stats = board.get_stats()  # 获取统计数据
 
-cycles = stats.get("cycles", 1)
-pipeline_width = 3
-
-decoded = stats.get("decoded_less_than_maximum_operations", 0)
-bdir_mispred = stats.get("branch_direction_misprediction", 0)
-ijtp_mispred = stats.get("ijtp_misprediction", 0)
-ras_mispred = stats.get("ras_mispredicted_target", 0)
-decode_stall = stats.get("instruction_decode_stall_from_recover", 0)
-instructions = stats.get("Instructions", 0)
-
-PARTIAL_SLOT_FACTOR = 2
-FETCH_WAIT_CYCLE = 2
-BPM_COST = 9
-
-frontend_bound = (decoded * PARTIAL_SLOT_FACTOR + (bdir_mispred + ijtp_mispred + ras_mispred) * FETCH_WAIT_CYCLE * pipeline_width) / (cycles * pipeline_width)
-bad_speculation = (((bdir_mispred + ijtp_mispred + ras_mispred) * BPM_COST * pipeline_width + decode_stall * pipeline_width)) / (cycles * pipeline_width)
-retiring = instructions / (cycles * pipeline_width)
-backend_bound = 1 - (frontend_bound + bad_speculation + retiring)
-ipc = instructions / cycles
-
-print("Metrics:")
-print("Frontend Bound:", frontend_bound)
-print("Bad Speculation:", bad_speculation)
-print("Retiring:", retiring)
-print("Backend Bound:", backend_bound)
-print("IPC", ipc)
\ No newline at end of file
+print_tma_metrics(compute_tma_metrics(stats))
\ No newline at end of file
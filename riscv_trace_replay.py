@@ -0,0 +1,155 @@
+"""
+This script replays elastic traces captured from the customized SiFive
+out-of-order CPU (see --capture-trace in riscv_fs_customized_cpu_ruby_spec_cpu2006.py)
+on a trace-driven CPU with a three-level classic cache hierarchy.
+
+Only the memory side is simulated, so a single capture can be reused to
+sweep cache sizes and DRAM models quickly.
+
+Characteristics:
+- Replays gzip-compressed elastic traces with a TraceCPU
+- L1 I/D caches, L2 cache and L3 cache created with cache_helper.py
+- Memory system selected from the gem5 standard library memory components
+
+Usage:
+------
+
+```
+scons build/RISCV/gem5.opt
+./build/RISCV/gem5.opt -d m5out/replay_l3_4MiB riscv_trace_replay.py \
+    --trace-dir <directory_of_the_captured_traces> \
+    --l3-size 4MiB \
+    --memory SingleChannelDDR4_2400
+```
+"""
+
+import argparse
+
+import m5
+from m5.objects import (
+    AddrRange,
+    BadAddr,
+    L2XBar,
+    Root,
+    SrcClockDomain,
+    System,
+    SystemXBar,
+    VoltageDomain,
+)
+
+from gem5.components import memory as memory_components
+
+from cache_helper import create_l1_cache, create_l2_cache, create_l3_cache
+from trace_helper import RISCV_MEM_START, create_trace_cpu
+
+# Memory systems that can be selected with --memory
+memory_choices = [
+    "SingleChannelDDR3_1600",
+    "SingleChannelDDR3_2133",
+    "SingleChannelDDR4_2400",
+    "SingleChannelLPDDR3_1600",
+    "SingleChannelHBM",
+    "DualChannelDDR3_1600",
+    "DualChannelDDR4_2400",
+]
+
+parser = argparse.ArgumentParser(
+    description="Replay elastic traces of the SiFive O3 CPU against a configurable memory hierarchy"
+)
+
+parser.add_argument(
+    "--trace-dir",
+    type=str,
+    required=True,
+    help="Directory containing fetchtrace.proto.gz and deptrace.proto.gz",
+)
+
+parser.add_argument(
+    "--clk-freq",
+    type=str,
+    default="32.5MHz",
+    help="Clock frequency of the replayed core and caches",
+)
+
+parser.add_argument("--l1i-size", type=str, default="32kB")
+parser.add_argument("--l1d-size", type=str, default="32kB")
+parser.add_argument("--l2-size", type=str, default="256kB")
+parser.add_argument("--l3-size", type=str, default="2MiB")
+parser.add_argument("--l3-assoc", type=int, default=16)
+
+parser.add_argument(
+    "--memory",
+    type=str,
+    default="SingleChannelDDR3_1600",
+    help="Memory system to replay the traces against",
+    choices=memory_choices,
+)
+
+parser.add_argument(
+    "--mem-size",
+    type=str,
+    default="8GiB",
+    help="Memory size, must cover all physical addresses of the captured system",
+)
+
+args = parser.parse_args()
+
+system = System(
+    clk_domain=SrcClockDomain(
+        clock=args.clk_freq,
+        voltage_domain=VoltageDomain(),
+    ),
+    mem_mode="timing",
+    cache_line_size=64,
+)
+
+# Setup the memory system at the same physical addresses as RiscvBoard
+memory = getattr(memory_components, args.memory)(size=args.mem_size)
+mem_range = AddrRange(start=RISCV_MEM_START, size=memory.get_size())
+memory.set_memory_range([mem_range])
+system.mem_ranges = [mem_range]
+system.memory = memory
+
+# Create the memory bus, accesses to device addresses end up in BadAddr
+system.membus = SystemXBar()
+system.badaddr = BadAddr()
+system.membus.default = system.badaddr.pio
+system.system_port = system.membus.cpu_side_ports
+for cntr in memory.get_memory_controllers():
+    cntr.port = system.membus.mem_side_ports
+
+# Setup the trace-driven CPU with the same queue sizes as the SiFive O3 core
+system.cpu = create_trace_cpu(args.trace_dir)
+system.cpu.createThreads()
+
+# Setup the cache hierarchy
+system.l1i_cache = create_l1_cache(args.l1i_size)
+system.l1d_cache = create_l1_cache(args.l1d_size)
+system.l2bus = L2XBar()
+system.l2_cache = create_l2_cache(args.l2_size)
+system.l3bus = L2XBar()
+system.l3_cache = create_l3_cache(args.l3_size, args.l3_assoc)
+
+# Connect CPU to L1 caches
+system.cpu.icache_port = system.l1i_cache.cpu_side
+system.cpu.dcache_port = system.l1d_cache.cpu_side
+
+# Connect L1 caches to L2 bus and L2 bus to L2 cache
+system.l1i_cache.mem_side = system.l2bus.cpu_side_ports
+system.l1d_cache.mem_side = system.l2bus.cpu_side_ports
+system.l2bus.mem_side_ports = system.l2_cache.cpu_side
+
+# Connect L2 cache to L3 bus and L3 cache between L3 bus and memory bus
+system.l2_cache.mem_side = system.l3bus.cpu_side_ports
+system.l3bus.mem_side_ports = system.l3_cache.cpu_side
+system.l3_cache.mem_side = system.membus.cpu_side_ports
+
+root = Root(full_system=False, system=system)
+m5.instantiate()
+
+print(f"Replaying traces from {args.trace_dir}")
+print("Beginning simulation!")
+exit_event = m5.simulate()
+
+print(f"Exiting @ tick {m5.curTick()} because {exit_event.getCause()}")
+print(f"Replayed {m5.curTick() / 1e12} simulated seconds")
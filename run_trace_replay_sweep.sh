@@ -0,0 +1,47 @@
+#!/bin/bash
+# Replay one elastic trace capture against several memory-side configurations.
+# Usage: ./run_trace_replay_sweep.sh <trace_dir> [output_dir]
+
+GEM5="${GEM5:-./build/RISCV/gem5.opt}"
+SCRIPT="$(dirname "$0")/riscv_trace_replay.py"
+TRACE_DIR="$1"
+OUTPUT_DIR="${2:-m5out/trace_replay_sweep}"
+
+# Define the configurations to sweep
+L3_SIZES="${L3_SIZES:-1MiB 2MiB 4MiB 8MiB}"
+MEMORIES="${MEMORIES:-SingleChannelDDR3_1600 SingleChannelDDR4_2400}"
+
+if [ ! -d "$TRACE_DIR" ]; then
+    echo "Trace directory $TRACE_DIR not found." >&2
+    exit 1
+fi
+
+# Run every configuration in parallel, each with its own output directory
+pids=()
+outdirs=()
+for l3_size in $L3_SIZES; do
+    for memory in $MEMORIES; do
+        outdir="${OUTPUT_DIR}/l3_${l3_size}_${memory}"
+        mkdir -p "$outdir"
+        "$GEM5" -d "$outdir" "$SCRIPT" \
+            --trace-dir "$TRACE_DIR" \
+            --l3-size "$l3_size" \
+            --memory "$memory" > "${outdir}/simulation_output.log" 2>&1 &
+        pids+=($!)
+        outdirs+=("$outdir")
+    done
+done
+
+# Wait for every replay and report the failed ones
+failed=0
+for i in "${!pids[@]}"; do
+    if ! wait "${pids[$i]}"; then
+        echo "Replay failed, see ${outdirs[$i]}/simulation_output.log" >&2
+        failed=$((failed + 1))
+    fi
+done
+
+if [ $failed -ne 0 ]; then
+    echo "${failed} of ${#pids[@]} replays failed." >&2
+    exit 1
+fi
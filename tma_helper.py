@@ -0,0 +1,56 @@
+"""
+Helper functions for computing the Top-Down Microarchitecture Analysis (TMA)
+metrics from the customized counters of the SiFive out-of-order CPU.
+"""
+
+# Constant values (see README.md)
+PIPELINE_WIDTH = 3
+PARTIAL_SLOT_FACTOR = 2
+FETCH_WAIT_CYCLE = 2
+BPM_COST = 9
+
+# Stat names of the counters used by the TMA formulas
+TMA_COUNTERS = [
+    "cycles",
+    "decoded_less_than_maximum_operations",
+    "branch_direction_misprediction",
+    "ijtp_misprediction",
+    "ras_mispredicted_target",
+    "instruction_decode_stall_from_recover",
+    "Instructions",
+]
+
+def compute_tma_metrics(stats):
+    """Compute the TMA level-1 metrics and the IPC from a stats dictionary"""
+    cycles = stats.get("cycles", 1)
+    pipeline_width = PIPELINE_WIDTH
+
+    decoded = stats.get("decoded_less_than_maximum_operations", 0)
+    bdir_mispred = stats.get("branch_direction_misprediction", 0)
+    ijtp_mispred = stats.get("ijtp_misprediction", 0)
+    ras_mispred = stats.get("ras_mispredicted_target", 0)
+    decode_stall = stats.get("instruction_decode_stall_from_recover", 0)
+    instructions = stats.get("Instructions", 0)
+
+    frontend_bound = (decoded * PARTIAL_SLOT_FACTOR + (bdir_mispred + ijtp_mispred + ras_mispred) * FETCH_WAIT_CYCLE * pipeline_width) / (cycles * pipeline_width)
+    bad_speculation = (((bdir_mispred + ijtp_mispred + ras_mispred) * BPM_COST * pipeline_width + decode_stall * pipeline_width)) / (cycles * pipeline_width)
+    retiring = instructions / (cycles * pipeline_width)
+    backend_bound = 1 - (frontend_bound + bad_speculation + retiring)
+    ipc = instructions / cycles
+
+    return {
+        'frontend_bound': frontend_bound,
+        'bad_speculation': bad_speculation,
+        'retiring': retiring,
+        'backend_bound': backend_bound,
+        'ipc': ipc
+    }
+
+def print_tma_metrics(metrics):
+    """Print the TMA metrics returned by compute_tma_metrics"""
+    print("Metrics:")
+    print("Frontend Bound:", metrics['frontend_bound'])
+    print("Bad Speculation:", metrics['bad_speculation'])
+    print("Retiring:", metrics['retiring'])
+    print("Backend Bound:", metrics['backend_bound'])
+    print("IPC", metrics['ipc'])
@@ -0,0 +1,27 @@
+from m5.params import *
+from m5.objects.Probe import ProbeListenerObject
+
+
+class TmaHotspotProfiler(ProbeListenerObject):
+    """
+    Sampling profiler attached to the probe points of an O3 CPU. For
+    committed user-mode instructions it records the PC of every
+    commit_sample_interval-th instruction, of every mispredicted branch and
+    of every load taking more than long_latency_threshold CPU cycles into
+    per-event histograms. The histograms are reset with the stats and
+    appended to output_file at every stats dump.
+    """
+
+    type = "TmaHotspotProfiler"
+    cxx_header = "tma_hotspot_profiler.hh"
+    cxx_class = "gem5::TmaHotspotProfiler"
+
+    commit_sample_interval = Param.Unsigned(
+        1000, "Sample the PC of every N-th committed instruction"
+    )
+    long_latency_threshold = Param.Cycles(
+        30, "Loads taking more CPU cycles than this are long-latency"
+    )
+    output_file = Param.String(
+        "tma_hotspots.txt", "File in the output directory for the histograms"
+    )
@@ -0,0 +1,131 @@
+#include "tma_hotspot_profiler.hh"
+
+#include <algorithm>
+#include <ostream>
+#include <vector>
+
+#include "arch/generic/isa.hh"
+#include "cpu/base.hh"
+#include "cpu/o3/dyn_inst.hh"
+#include "cpu/thread_context.hh"
+
+namespace gem5
+{
+
+TmaHotspotProfiler::TmaHotspotProfiler(const TmaHotspotProfilerParams &params)
+    : ProbeListenerObject(params),
+      cpu(dynamic_cast<BaseCPU *>(params.manager)),
+      commitSampleInterval(params.commit_sample_interval),
+      longLatencyThreshold(params.long_latency_threshold),
+      outputFile(params.output_file),
+      stream(nullptr),
+      numRetiredInsts(0),
+      numDumps(0)
+{
+    fatal_if(!cpu, "TmaHotspotProfiler must be attached to a CPU");
+    fatal_if(commitSampleInterval == 0,
+             "commit_sample_interval must be greater than 0");
+}
+
+void
+TmaHotspotProfiler::regProbeListeners()
+{
+    listeners.push_back(
+        new ProbeListenerArg<TmaHotspotProfiler, o3::DynInstPtr>(
+            this, "Commit", &TmaHotspotProfiler::commit));
+    listeners.push_back(
+        new ProbeListenerArg<TmaHotspotProfiler, InstPacketPair>(
+            this, "DataAccessComplete",
+            &TmaHotspotProfiler::dataAccessComplete));
+}
+
+void
+TmaHotspotProfiler::commit(const o3::DynInstPtr &inst)
+{
+    // Loads older than this one have either committed or been squashed
+    const bool long_latency_load =
+        pendingLongLatencyLoads.erase(inst->seqNum) > 0;
+    pendingLongLatencyLoads.erase(
+        pendingLongLatencyLoads.begin(),
+        pendingLongLatencyLoads.upper_bound(inst->seqNum));
+
+    // Only user-mode samples can be symbolized against the benchmark
+    if (!inst->tcBase()->getIsaPtr()->inUserMode())
+        return;
+
+    const Addr pc = inst->pcState().instAddr();
+    if (++numRetiredInsts % commitSampleInterval == 0)
+        commitSamples[pc]++;
+    // Checked at commit so that wrong-path branches are not counted
+    if (inst->isControl() && inst->mispredicted())
+        mispredictSamples[pc]++;
+    if (long_latency_load)
+        longLatencyLoadSamples[pc]++;
+}
+
+void
+TmaHotspotProfiler::dataAccessComplete(const InstPacketPair &inst_pkt)
+{
+    const o3::DynInstPtr &inst = inst_pkt.first;
+    const PacketPtr pkt = inst_pkt.second;
+    if (!inst->isLoad() || !pkt->req->hasTime())
+        return;
+    if (curTick() - pkt->req->time() >
+        cpu->cyclesToTicks(longLatencyThreshold))
+        pendingLongLatencyLoads.insert(inst->seqNum);
+}
+
+void
+TmaHotspotProfiler::resetStats()
+{
+    ProbeListenerObject::resetStats();
+    numRetiredInsts = 0;
+    pendingLongLatencyLoads.clear();
+    commitSamples.clear();
+    mispredictSamples.clear();
+    longLatencyLoadSamples.clear();
+}
+
+void
+TmaHotspotProfiler::preDumpStats()
+{
+    ProbeListenerObject::preDumpStats();
+    dumpHistograms();
+}
+
+void
+TmaHotspotProfiler::dumpHistograms()
+{
+    if (!stream)
+        stream = simout.create(outputFile);
+    std::ostream &os = *stream->stream();
+
+    // Dumps are appended in the same way as stats.txt
+    os << "---------- Begin Hotspot Samples " << numDumps++
+       << " ----------\n";
+    os << "# tick " << curTick() << " retired_insts " << numRetiredInsts
+       << " commit_sample_interval " << commitSampleInterval
+       << " long_latency_threshold " << longLatencyThreshold << "\n";
+
+    const std::pair<const char *, const Histogram *> histograms[] = {
+        {"commit", &commitSamples},
+        {"mispredict", &mispredictSamples},
+        {"long_latency_load", &longLatencyLoadSamples},
+    };
+    for (const auto &[event, histogram] : histograms) {
+        std::vector<std::pair<Addr, uint64_t>> samples(histogram->begin(),
+                                                       histogram->end());
+        std::sort(samples.begin(), samples.end(),
+                  [](const auto &a, const auto &b) {
+                      return a.second > b.second;
+                  });
+        for (const auto &[pc, count] : samples)
+            os << event << " 0x" << std::hex << pc << std::dec << " "
+               << count << "\n";
+    }
+
+    os << "---------- End Hotspot Samples ----------\n";
+    os.flush();
+}
+
+} // namespace gem5
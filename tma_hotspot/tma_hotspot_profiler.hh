@@ -0,0 +1,75 @@
+#ifndef __TMA_HOTSPOT_PROFILER_HH__
+#define __TMA_HOTSPOT_PROFILER_HH__
+
+#include <cstdint>
+#include <set>
+#include <string>
+#include <unordered_map>
+#include <utility>
+
+#include "base/output.hh"
+#include "base/types.hh"
+#include "cpu/inst_seq.hh"
+#include "cpu/o3/dyn_inst_ptr.hh"
+#include "mem/packet.hh"
+#include "params/TmaHotspotProfiler.hh"
+#include "sim/probe/probe.hh"
+
+namespace gem5
+{
+
+class BaseCPU;
+
+/**
+ * Sampling profiler recording per-PC histograms of committed user-mode
+ * instructions, mispredicted branches and long-latency loads of an O3 CPU.
+ */
+class TmaHotspotProfiler : public ProbeListenerObject
+{
+  public:
+    typedef std::unordered_map<Addr, uint64_t> Histogram;
+    typedef std::pair<o3::DynInstPtr, PacketPtr> InstPacketPair;
+
+    TmaHotspotProfiler(const TmaHotspotProfilerParams &params);
+
+    void regProbeListeners() override;
+
+    void resetStats() override;
+
+    void preDumpStats() override;
+
+    /**
+     * Sample the PC of a committed user-mode instruction and record it if
+     * it was a mispredicted branch or a long-latency load
+     */
+    void commit(const o3::DynInstPtr &inst);
+
+    /** Remember a load if it exceeded the latency threshold */
+    void dataAccessComplete(const InstPacketPair &inst_pkt);
+
+  private:
+    /** Append the histograms to the output file */
+    void dumpHistograms();
+
+    BaseCPU *cpu;
+
+    const uint64_t commitSampleInterval;
+    const Cycles longLatencyThreshold;
+    const std::string outputFile;
+
+    OutputStream *stream;
+
+    uint64_t numRetiredInsts;
+    uint64_t numDumps;
+
+    /** Long-latency loads that have not committed or been squashed yet */
+    std::set<InstSeqNum> pendingLongLatencyLoads;
+
+    Histogram commitSamples;
+    Histogram mispredictSamples;
+    Histogram longLatencyLoadSamples;
+};
+
+} // namespace gem5
+
+#endif // __TMA_HOTSPOT_PROFILER_HH__
@@ -0,0 +1,145 @@
+"""
+This script symbolizes the per-PC samples of the TmaHotspotProfiler against
+a benchmark's RISC-V ELF and reports the top functions per TMA category.
+It runs with plain python3, without gem5.
+
+Usage:
+------
+
+```
+python3 tma_hotspot_report.py m5out/tma_hotspots.txt \
+    --image <full_path_to_the_spec-2006_disk_image> --partition 1 \
+    --elf-in-image <path_of_the_benchmark_binary_in_the_image>
+```
+or, with a binary already copied out of the image:
+```
+python3 tma_hotspot_report.py m5out/tma_hotspots.txt --elf mcf_base.riscv
+```
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from hotspot_helper import (
+    SymbolTable,
+    attribute_hotspots,
+    extract_from_image,
+    get_partition_offset,
+    read_hotspot_samples,
+)
+
+parser = argparse.ArgumentParser(
+    description="Report the top functions per TMA category from TmaHotspotProfiler samples"
+)
+
+parser.add_argument(
+    "samples",
+    type=str,
+    help="Output file of the TmaHotspotProfiler",
+)
+
+parser.add_argument(
+    "--dump",
+    type=int,
+    default=0,
+    help="Index of the stats dump to report, the first dump is the ROI of the SPEC script",
+)
+
+parser.add_argument(
+    "--elf",
+    type=str,
+    default=None,
+    help="Benchmark binary on the local disk",
+)
+
+parser.add_argument(
+    "--image",
+    type=str,
+    default=None,
+    help="Disk image to copy the benchmark binary out of",
+)
+
+parser.add_argument(
+    "--partition",
+    type=int,
+    default=None,
+    help="Partition of the disk image holding the binary, numbered from 1 as for the SPEC script",
+)
+
+parser.add_argument(
+    "--image-offset",
+    type=int,
+    default=0,
+    help="Byte offset of the file system in the disk image, instead of --partition",
+)
+
+parser.add_argument(
+    "--elf-in-image",
+    type=str,
+    default=None,
+    help="Path of the benchmark binary inside the disk image",
+)
+
+parser.add_argument(
+    "--load-base",
+    type=lambda value: int(value, 0),
+    default=0,
+    help="Load address of a position-independent binary",
+)
+
+parser.add_argument(
+    "--nm",
+    type=str,
+    default="riscv64-linux-gnu-nm",
+    help="nm tool able to read RISC-V ELF files",
+)
+
+parser.add_argument("--top", type=int, default=10)
+
+parser.add_argument(
+    "--json",
+    type=str,
+    default=None,
+    help="Also write the report to this JSON file",
+)
+
+args = parser.parse_args()
+
+if args.elf is None and (args.image is None or args.elf_in_image is None):
+    parser.error("either --elf or both --image and --elf-in-image are required")
+
+if args.partition is not None and args.image_offset:
+    parser.error("--partition and --image-offset are mutually exclusive")
+
+samples = read_hotspot_samples(args.samples, dump=args.dump)
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    elf = args.elf
+    if elf is None:
+        offset = args.image_offset
+        if args.partition is not None:
+            offset = get_partition_offset(args.image, args.partition)
+        elf = extract_from_image(
+            args.image,
+            args.elf_in_image,
+            os.path.join(tmp_dir, os.path.basename(args.elf_in_image)),
+            offset=offset,
+        )
+    symbols = SymbolTable(elf, nm=args.nm, load_base=args.load_base)
+
+report = attribute_hotspots(samples, symbols, top=args.top)
+
+for category, result in report.items():
+    print(f"{category} ({result['event']}, {result['total_samples']} samples):")
+    for entry in result['functions']:
+        low, high = entry['confidence_interval']
+        print(
+            f"  {entry['fraction'] * 100:6.2f}% [{low * 100:6.2f}%, {high * 100:6.2f}%]"
+            f" {entry['samples']:>10} {entry['function']}"
+        )
+
+if args.json:
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
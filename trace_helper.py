@@ -0,0 +1,65 @@
+"""
+Helper functions for capturing elastic traces from the O3 CPU and building
+a trace-driven system to replay them against different memory hierarchies.
+
+Both trace files are gzip-compressed protobuf streams, which gem5 reads and
+writes incrementally, so a capture is never loaded into memory at once.
+gem5 has to be built with protobuf support for the ElasticTrace and TraceCPU
+objects to be available.
+"""
+
+import os
+
+# RiscvBoard places the physical memory right after the I/O region
+RISCV_MEM_START = 0x80000000
+
+def get_trace_paths(trace_dir):
+    """Return the instruction fetch and data dependency trace paths"""
+    trace_dir = os.path.abspath(trace_dir)
+    return (
+        os.path.join(trace_dir, "fetchtrace.proto.gz"),
+        os.path.join(trace_dir, "deptrace.proto.gz"),
+    )
+
+def attach_elastic_trace(cpu, trace_dir, start_inst):
+    """
+    Attach an ElasticTrace probe listener to an O3 CPU object. Tracing starts
+    once the CPU has committed start_inst instructions (0 starts right away)
+    and physical addresses are recorded so that the trace can be replayed
+    without the kernel.
+    """
+    from m5.objects import ElasticTrace
+
+    os.makedirs(os.path.abspath(trace_dir), exist_ok=True)
+    inst_trace, data_trace = get_trace_paths(trace_dir)
+    cpu.traceListener = ElasticTrace(
+        instFetchTraceFile=inst_trace,
+        dataDepTraceFile=data_trace,
+        depWindowSize=3 * cpu.numROBEntries,
+        startTraceInst=start_inst,
+        traceVirtAddr=False
+    )
+
+    # Stalls on a full ROB or LSQ would be recorded as compute delay, so make
+    # them large as in gem5's config_etrace, the real sizes are modelled by
+    # the TraceCPU on replay
+    cpu.numROBEntries = 512
+    cpu.LQEntries = 128
+    cpu.SQEntries = 128
+
+def create_trace_cpu(trace_dir, rob_size=128, lq_size=32, sq_size=32):
+    """Create a TraceCPU replaying the traces in trace_dir"""
+    from m5.objects import TraceCPU
+
+    inst_trace, data_trace = get_trace_paths(trace_dir)
+    for path in (inst_trace, data_trace):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Trace file {path} not found")
+    return TraceCPU(
+        instTraceFile=inst_trace,
+        dataTraceFile=data_trace,
+        sizeROB=rob_size,
+        sizeLoadBuffer=lq_size,
+        sizeStoreBuffer=sq_size,
+        enableEarlyExit=True
+    )
@@ -0,0 +1,181 @@
+"""
+Helper functions for validating a board configuration without simulating it.
+
+The board is instantiated (which also writes config.ini/config.json into the
+output directory), every port is checked for a connection to an orphan node
+and every TMA counter is looked up in the stats groups of the cores. A
+pass/fail summary is printed and written to validation.json so that sweep
+tooling can check many configurations in parallel.
+"""
+
+import json
+import os
+import time
+
+from tma_helper import TMA_COUNTERS
+
+# Ports that must be connected, gem5 lets all other ports stay unconnected
+REQUIRED_PORTS = {
+    'BaseCache': ["cpu_side", "mem_side"],
+    'BaseCPU': ["icache_port", "dcache_port"],
+}
+
+def find_port_errors(root):
+    """
+    Return a list of ports connected to orphan nodes and of unconnected
+    ports listed in REQUIRED_PORTS
+    """
+    import m5.objects
+    from m5.params import VectorPort
+
+    required_types = [
+        (getattr(m5.objects, type_name), names)
+        for type_name, names in REQUIRED_PORTS.items()
+    ]
+
+    # Objects outside the tree of root, including whole detached subtrees
+    reachable = set(root.descendants())
+
+    errors = []
+    for obj in reachable:
+        for obj_type, names in required_types:
+            if not isinstance(obj, obj_type):
+                continue
+            for name in names:
+                ref = obj._port_refs.get(name)
+                if ref is None or ref.peer is None:
+                    errors.append(f"{obj.path()}.{name} is not connected")
+
+        for name, port in obj._ports.items():
+            ref = obj._port_refs.get(name)
+            if ref is None:
+                continue
+            refs = ref.elements if isinstance(port, VectorPort) else [ref]
+            for element in refs:
+                if element.peer is not None and element.peer.simobj not in reachable:
+                    errors.append(
+                        f"{element} is connected to orphan node "
+                        f"{element.peer.simobj}"
+                    )
+    return errors
+
+def write_config(root):
+    """Write config.ini/config.json the same way m5.instantiate does"""
+    import m5
+
+    if m5.options.dump_config:
+        with open(os.path.join(m5.options.outdir, m5.options.dump_config), "w") as f:
+            root.print_ini(f)
+    if m5.options.json_config:
+        with open(os.path.join(m5.options.outdir, m5.options.json_config), "w") as f:
+            json.dump(root.get_config_as_dict(), f, indent=4)
+
+def find_stat_paths(group, prefix=""):
+    """Return the dotted paths of all stats in a stats group and its subgroups"""
+    paths = [f"{prefix}{stat.name}" for stat in group.getStats()]
+    for name, subgroup in group.getStatGroups().items():
+        paths.extend(find_stat_paths(subgroup, f"{prefix}{name}."))
+    return paths
+
+def find_counter_paths(board, tma_counters):
+    """
+    Map every TMA counter to the paths of the matching stats of the cores. A
+    counter matches a stat of a core group, or of one of its subgroups, whose
+    path relative to the core ends with the counter name.
+    """
+    counter_paths = {name: [] for name in tma_counters}
+    for core in board.get_processor().get_cores():
+        cpu = core.get_simobject()
+        for path in find_stat_paths(cpu.getCCObject()):
+            for name in tma_counters:
+                if path == name or path.endswith(f".{name}"):
+                    counter_paths[name].append(f"{cpu.path()}.{path}")
+    return counter_paths
+
+def run_check(checks, name, check):
+    """
+    Run a check returning a list of errors and record it, an exception is
+    recorded as a failure. Return True if the check passed.
+    """
+    try:
+        errors = check()
+    except Exception as e:
+        errors = [f"{type(e).__name__}: {e}"]
+    checks.append({'name': name, 'passed': not errors, 'errors': errors})
+    return not errors
+
+def write_summary(summary):
+    """Write the summary to validation.json in the output directory"""
+    import m5
+
+    with open(os.path.join(m5.options.outdir, "validation.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+def validate_board(board, tma_counters=TMA_COUNTERS):
+    """
+    Build and instantiate the SimObject graph of the board without simulating.
+    Return 0 if all checks pass and 1 otherwise.
+    """
+    import m5
+
+    start_time = time.time()
+    checks = []
+    state = {}
+    counter_paths = {}
+
+    def build():
+        state['root'] = board._pre_instantiate()
+        return []
+
+    def instantiate():
+        m5.instantiate()
+        return []
+
+    def check_counters():
+        counter_paths.update(find_counter_paths(board, tma_counters))
+        return [
+            f"stat '{name}' not found in the cores"
+            for name, paths in counter_paths.items() if not paths
+        ]
+
+    if run_check(checks, "build", build):
+        root = state['root']
+        if run_check(checks, "ports", lambda: find_port_errors(root)):
+            # A fatal() from C++ ends the process, so leave a failed
+            # summary behind until instantiation is known to succeed
+            write_summary({
+                'passed': False,
+                'elapsed_time': time.time() - start_time,
+                'checks': checks + [{
+                    'name': "instantiate",
+                    'passed': False,
+                    'errors': ["m5.instantiate() did not return"]
+                }],
+                'tma_counters': {}
+            })
+            if run_check(checks, "instantiate", instantiate):
+                run_check(checks, "tma_counters", check_counters)
+        else:
+            # Instantiating with orphan nodes or unconnected required ports
+            # ends in an error or a fatal() from C++, so only write the
+            # configuration
+            run_check(checks, "config", lambda: write_config(root) or [])
+
+    passed = all(check['passed'] for check in checks)
+    elapsed_time = time.time() - start_time
+
+    print("Validation summary:")
+    for check in checks:
+        print(f"  {check['name']}: {'PASS' if check['passed'] else 'FAIL'}")
+        for error in check['errors']:
+            print(f"    {error}")
+    print(f"Validation {'PASSED' if passed else 'FAILED'} in {elapsed_time:.2f}s")
+
+    write_summary({
+        'passed': passed,
+        'elapsed_time': elapsed_time,
+        'checks': checks,
+        'tma_counters': counter_paths
+    })
+
+    return 0 if passed else 1